@@ -2,14 +2,43 @@
 # Multi-source job aggregation module
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import feedparser
-from typing import List, Dict, Any, Set
+from typing import List, Dict, Any, Set, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from bisect import bisect_right
+import heapq
+import orjson
+import difflib
+import threading
+import logging
+from cachetools import TTLCache
 import os
 from dotenv import load_dotenv
 
+try:
+    import ahocorasick
+except ImportError:  # optional: falls back to per-term substring checks
+    ahocorasick = None
+
+try:
+    import xxhash
+except ImportError:  # optional: falls back to the built-in str hash
+    xxhash = None
+
+try:
+    from rapidfuzz import fuzz
+except ImportError:  # optional: falls back to difflib
+    fuzz = None
+
 # Load environment variables
 load_dotenv()
 
+# Propagates to the app's queued "jobsathi" handler
+logger = logging.getLogger("jobsathi.job_search")
+
 # -----------------------------
 # API CREDENTIALS
 # -----------------------------
@@ -18,101 +47,195 @@ ADZUNA_APP_KEY = os.getenv("ADZUNA_APP_KEY", "")
 JOOBLE_KEY = os.getenv("JOOBLE_KEY", "")
 SERPAPI_KEY = os.getenv("SERPAPI_KEY", "")
 
+# Number of keywords OR-ed into each source's query
+KEYWORDS_PER_SOURCE = 5
+
+# Placeholder values the LLM emits for missing profile fields
+NULL_VALUES = frozenset({"null", "none", "n/a", ""})
+# Languages too common to signal a match
+IGNORED_LANGUAGES = NULL_VALUES | {"english"}
+NULL_YEARS = NULL_VALUES | {"0"}
+
+
+# -----------------------------
+# HTTP SESSION
+# -----------------------------
+# Shared session so repeated calls to the same host reuse pooled keep-alive
+# connections instead of paying a fresh TCP + TLS handshake every time.
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=32,
+    # Retry-After is ignored: a 429 asking for an hour would otherwise park a
+    # fetch thread (and the search waiting on it) for that long
+    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[429, 502, 503, 504],
+                      respect_retry_after_header=False)
+))
+
 
 # -----------------------------
 # DYNAMIC KEYWORD GENERATOR
 # -----------------------------
-def generate_keywords(profile: Dict[str, Any]) -> List[str]:
-    """Generate search keywords from profile data."""
-    keywords = set()
+def dedupe_keywords(keywords: List[str]) -> List[str]:
+    """
+    Drop case-insensitive duplicates and keywords whose words already appear in
+    another keyword, keeping the longer, more specific one in the earlier slot.
+    """
+    kept: List[str] = []
+    kept_lc: List[str] = []
+    for kw in keywords:
+        # Pad with spaces so containment only matches whole words
+        lc = f" {' '.join(kw.lower().split())} "
+        if any(lc in existing for existing in kept_lc):
+            continue
+        covered = [i for i, existing in enumerate(kept_lc) if existing in lc]
+        if covered:
+            kept[covered[0]] = kw
+            kept_lc[covered[0]] = lc
+            for i in reversed(covered[1:]):
+                del kept[i]
+                del kept_lc[i]
+        else:
+            kept.append(kw)
+            kept_lc.append(lc)
+    return kept
 
-    # Primary role - highest priority
-    role = profile.get("role", "")
-    if role and isinstance(role, str) and role.lower() not in ['null', 'none', '']:
-        keywords.add(role.strip())
-    
-    # Skills - add ALL relevant skills
-    skills = profile.get("skills", [])
-    if isinstance(skills, list):
-        for skill in skills:
-            if skill and isinstance(skill, str) and len(skill.strip()) > 2:
-                keywords.add(skill.strip())
-    
-    # Experience details - extract roles and companies
+
+def _collect(items: Any, key: Optional[str] = None, minlen: int = 0) -> List[str]:
+    """Stripped, non-null strings from a profile list, optionally read from dict items."""
+    if not isinstance(items, list):
+        return []
+    collected = []
+    for item in items:
+        if key is not None:
+            item = item.get(key) if isinstance(item, dict) else None
+        if isinstance(item, str):
+            item = item.strip()
+            if len(item) > minlen and item.lower() not in NULL_VALUES:
+                collected.append(item)
+    return collected
+
+
+def generate_keywords(profile: Dict[str, Any]) -> List[str]:
+    """Generate search keywords from profile data, most important first."""
     experience_details = profile.get("experience_details", [])
-    if isinstance(experience_details, list):
-        for exp in experience_details:
-            if isinstance(exp, dict):
-                exp_role = exp.get("role", "")
-                if exp_role and isinstance(exp_role, str):
-                    keywords.add(exp_role.strip())
-                # Also add company industry/type if relevant
-                company = exp.get("company", "")
-                if company and isinstance(company, str):
-                    keywords.add(company.strip())
-    
-    # Education - add field of study
-    education = profile.get("education", [])
-    if isinstance(education, list):
-        for edu in education:
-            if isinstance(edu, dict):
-                degree = edu.get("degree", "")
-                if degree and isinstance(degree, str):
-                    keywords.add(degree.strip())
-    
-    # Certifications - add as keywords
-    certifications = profile.get("certifications", [])
-    if isinstance(certifications, list):
-        for cert in certifications:
-            if cert and isinstance(cert, str) and len(cert.strip()) > 2:
-                keywords.add(cert.strip())
-    
-    # Remove any null, empty, or invalid keywords
-    keywords = {k for k in keywords if k and isinstance(k, str) and k.lower() not in ['null', 'none', 'n/a', '']}
-    
-    # Prioritize role and skills, limit total to avoid too many API calls
-    keyword_list = list(keywords)
-    # Put role first if it exists
-    if role and role in keyword_list:
-        keyword_list.remove(role)
-        keyword_list.insert(0, role)
-    
-    return keyword_list[:8]  # Increased from 5 to 8 for better coverage
+    keywords = (
+        # Primary role - highest priority
+        _collect([profile.get("role", "")])
+        # Skills - add ALL relevant skills
+        + _collect(profile.get("skills", []), minlen=2)
+        # Experience details - roles and companies
+        + _collect(experience_details, key="role")
+        + _collect(experience_details, key="company")
+        # Education - field of study
+        + _collect(profile.get("education", []), key="degree")
+        # Certifications
+        + _collect(profile.get("certifications", []), minlen=2)
+    )
+    
+    # Collapse duplicates so each API call searches something new,
+    # and limit total to avoid too many API calls
+    return dedupe_keywords(keywords)[:8]
+
+
+# -----------------------------
+# JOB NORMALIZATION
+# -----------------------------
+NORMALIZED_FIELDS = ("title", "company", "location", "description")
+NORMALIZED_KEYS = tuple(f"_{name}_lc" for name in NORMALIZED_FIELDS)
+
+
+def normalize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Attach lowercased copies of the fields used by dedup and scoring, once."""
+    if "_title_lc" not in job:
+        for name, key in zip(NORMALIZED_FIELDS, NORMALIZED_KEYS):
+            value = job.get(name)
+            job[key] = str(value).lower() if value else ""
+    return job
+
+
+def _job_record(source: str, title: str, company: str, location: str,
+                url: str, description: str, salary: Any) -> Dict[str, Any]:
+    """
+    Build a unified job dict with its lowercased fields in a single pass.
+    Callers null-coalesce API values, so every text field is already a str.
+    """
+    return {
+        "source": source,
+        "title": title,
+        "company": company,
+        "location": location,
+        "url": url,
+        "description": description,
+        "salary": salary,
+        "_title_lc": title.lower(),
+        "_company_lc": company.lower(),
+        "_location_lc": location.lower(),
+        "_description_lc": description.lower(),
+    }
+
+
+def strip_normalized(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Remove the internal lowercased fields before a job leaves this module."""
+    for key in NORMALIZED_KEYS:
+        job.pop(key, None)
+    return job
 
 
 # -----------------------------
 # ADZUNA API
 # -----------------------------
+def adzuna_keyword_groups(keywords: List[str]) -> List[List[str]]:
+    """
+    Split keywords into the groups fetch_adzuna queries one request each.
+
+    what_or treats every space-separated word as an alternative, so a
+    multi-word keyword like "Cab Driver" would match any job mentioning
+    "driver". Single-word keywords share one group; each multi-word keyword
+    is its own group and is searched as a phrase.
+    """
+    words = [kw for kw in keywords if len(kw.split()) == 1]
+    groups = [[kw] for kw in keywords if len(kw.split()) > 1]
+    if words:
+        groups.insert(0, words)
+    return groups
+
+
 def fetch_adzuna(keywords: List[str], location: str = "India") -> List[Dict[str, Any]]:
-    """Fetch jobs from Adzuna API."""
+    """
+    Fetch jobs from Adzuna API for one group from adzuna_keyword_groups:
+    single words OR-ed together, or a single multi-word phrase.
+    """
     results = []
     
     try:
-        for kw in keywords[:3]:  # Limit to 3 keywords to reduce API calls
-            params = {
-                "app_id": ADZUNA_APP_ID,
-                "app_key": ADZUNA_APP_KEY,
-                "results_per_page": 20,
-                "what": kw,
-                "where": location
-            }
-            url = "https://api.adzuna.com/v1/api/jobs/in/search/1"
-            r = requests.get(url, params=params, timeout=10)
-
-            if r.status_code == 200:
-                data = r.json()
-                for job in data.get("results", []):
-                    results.append({
-                        "source": "Adzuna",
-                        "title": job.get("title", ""),
-                        "company": job.get("company", {}).get("display_name", "N/A"),
-                        "location": job.get("location", {}).get("display_name", location),
-                        "url": job.get("redirect_url", ""),
-                        "description": job.get("description", "")[:300],  # Truncate long descriptions
-                        "salary": job.get("salary_max", "Not specified")
-                    })
-    except Exception as e:
-        print(f"Adzuna API error: {e}")
+        params = {
+            "app_id": ADZUNA_APP_ID,
+            "app_key": ADZUNA_APP_KEY,
+            "results_per_page": 50,
+            "where": location
+        }
+        if len(keywords) == 1 and len(keywords[0].split()) > 1:
+            params["what_phrase"] = keywords[0]
+        else:
+            params["what_or"] = " ".join(keywords)
+        url = "https://api.adzuna.com/v1/api/jobs/in/search/1"
+        r = SESSION.get(url, params=params, timeout=10)
+
+        if r.status_code == 200:
+            data = orjson.loads(r.content)
+            for job in data.get("results", []):
+                results.append(_job_record(
+                    "Adzuna",
+                    job.get("title") or "",
+                    (job.get("company") or {}).get("display_name") or "N/A",
+                    (job.get("location") or {}).get("display_name") or location,
+                    job.get("redirect_url") or "",
+                    (job.get("description") or "")[:300],  # Truncate long descriptions
+                    job.get("salary_max") or "Not specified"
+                ))
+    except Exception:
+        logger.exception("Adzuna API error")
     
     return results
 
@@ -121,30 +244,28 @@ def fetch_adzuna(keywords: List[str], location: str = "India") -> List[Dict[str,
 # JOOBLE API
 # -----------------------------
 def fetch_jooble(keywords: List[str], location: str = "India") -> List[Dict[str, Any]]:
-    """Fetch jobs from Jooble API."""
+    """Fetch jobs matching any of the keywords from Jooble API in one request."""
     results = []
     
     try:
         url = f"https://in.jooble.org/api/{JOOBLE_KEY}"
-        
-        for kw in keywords[:3]:  # Limit to 3 keywords
-            payload = {"keywords": kw, "location": location}
-            r = requests.post(url, json=payload, timeout=10)
-
-            if r.status_code == 200:
-                data = r.json()
-                for job in data.get("jobs", []):
-                    results.append({
-                        "source": "Jooble",
-                        "title": job.get("title", ""),
-                        "company": job.get("company", "N/A"),
-                        "location": job.get("location", location),
-                        "url": job.get("link", ""),
-                        "description": job.get("snippet", "")[:300],
-                        "salary": job.get("salary", "Not specified")
-                    })
-    except Exception as e:
-        print(f"Jooble API error: {e}")
+        payload = {"keywords": " OR ".join(keywords), "location": location}
+        r = SESSION.post(url, json=payload, timeout=10)
+
+        if r.status_code == 200:
+            data = orjson.loads(r.content)
+            for job in data.get("jobs", []):
+                results.append(_job_record(
+                    "Jooble",
+                    job.get("title") or "",
+                    job.get("company") or "N/A",
+                    job.get("location") or location,
+                    job.get("link") or "",
+                    (job.get("snippet") or "")[:300],
+                    job.get("salary") or "Not specified"
+                ))
+    except Exception:
+        logger.exception("Jooble API error")
     
     return results
 
@@ -153,121 +274,328 @@ def fetch_jooble(keywords: List[str], location: str = "India") -> List[Dict[str,
 # SERPAPI GOOGLE JOBS
 # -----------------------------
 def fetch_serpapi(keywords: List[str], location: str = "India") -> List[Dict[str, Any]]:
-    """Fetch jobs from Google Jobs via SerpAPI."""
+    """Fetch jobs matching any of the keywords from Google Jobs via SerpAPI in one request."""
     results = []
     
     try:
-        for kw in keywords[:3]:  # Limit to 3 keywords
-            params = {
-                "engine": "google_jobs",
-                "q": kw,
-                "location": location,
-                "api_key": SERPAPI_KEY
-            }
-            url = "https://serpapi.com/search"
-            r = requests.get(url, params=params, timeout=10)
-
-            if r.status_code == 200:
-                data = r.json()
-                for job in data.get("jobs_results", []):
-                    apply_link = ""
-                    apply_options = job.get("apply_options", [])
-                    if apply_options and len(apply_options) > 0:
-                        apply_link = apply_options[0].get("link", "")
-                    
-                    results.append({
-                        "source": "Google Jobs",
-                        "title": job.get("title", ""),
-                        "company": job.get("company_name", "N/A"),
-                        "location": job.get("location", location),
-                        "url": apply_link,
-                        "description": job.get("description", "")[:300],
-                        "salary": "Not specified"
-                    })
-    except Exception as e:
-        print(f"SerpAPI error: {e}")
+        params = {
+            "engine": "google_jobs",
+            "q": " OR ".join(f'"{kw}"' for kw in keywords),
+            "location": location,
+            "api_key": SERPAPI_KEY
+        }
+        url = "https://serpapi.com/search"
+        r = SESSION.get(url, params=params, timeout=10)
+
+        if r.status_code == 200:
+            data = orjson.loads(r.content)
+            for job in data.get("jobs_results", []):
+                apply_link = ""
+                apply_options = job.get("apply_options")
+                if apply_options:
+                    apply_link = apply_options[0].get("link") or ""
+                
+                results.append(_job_record(
+                    "Google Jobs",
+                    job.get("title") or "",
+                    job.get("company_name") or "N/A",
+                    job.get("location") or location,
+                    apply_link,
+                    (job.get("description") or "")[:300],
+                    "Not specified"
+                ))
+    except Exception:
+        logger.exception("SerpAPI error")
     
     return results
 
 
+# -----------------------------
+# RESPONSE CACHE
+# -----------------------------
+# Recent API results keyed by (source, keywords, location) so repeated
+# searches within the TTL skip the network entirely.
+FETCH_CACHE_TTL = 900  # seconds
+_fetch_cache: TTLCache = TTLCache(maxsize=1024, ttl=FETCH_CACHE_TTL)
+_fetch_cache_lock = threading.Lock()
+
+
+def cached_fetch(fetch, keywords: List[str], location: str) -> List[Dict[str, Any]]:
+    """Call a fetch_* function through the TTL cache; empty results are not cached."""
+    key = (fetch.__name__, tuple(kw.lower() for kw in keywords), location.lower())
+    with _fetch_cache_lock:
+        cached = _fetch_cache.get(key)
+    if cached is None:
+        cached = fetch(keywords, location)
+        if cached:
+            with _fetch_cache_lock:
+                _fetch_cache[key] = cached
+    # Hand out copies since callers annotate jobs in place
+    return [dict(job) for job in cached]
+
+
+# -----------------------------
+# PARALLEL FETCH
+# -----------------------------
+def fetch_all_sources(keywords: List[str], location: str) -> List[List[Dict[str, Any]]]:
+    """
+    Fetch jobs from every source concurrently, OR-ing the keywords into one
+    query per source. Adzuna sends one query per adzuna_keyword_groups
+    group, each on its own thread, so its latency stays one round trip.
+
+    Returns one result list per source (Adzuna, Jooble, SerpAPI).
+    """
+    others = [fetch_jooble, fetch_serpapi]
+    if not keywords:
+        return [[] for _ in range(len(others) + 1)]
+
+    adzuna_groups = adzuna_keyword_groups(keywords)
+    with ThreadPoolExecutor(max_workers=len(adzuna_groups) + len(others)) as executor:
+        adzuna = [executor.submit(cached_fetch, fetch_adzuna, group, location) for group in adzuna_groups]
+        futures = [executor.submit(cached_fetch, fetch, keywords, location) for fetch in others]
+        return [[job for future in adzuna for job in future.result()]] + [future.result() for future in futures]
+
+
 # -----------------------------
 # MERGE & REMOVE DUPLICATES
 # -----------------------------
+def job_fingerprint(title: str, company: str, location: str) -> int:
+    """64-bit fingerprint of a normalized (title, company, location) triple."""
+    key = f"{title}\x00{company}\x00{location}"
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(key.encode())
+    return hash(key)
+
+
 def merge_results(*sources: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
     """Merge job results and remove duplicates."""
-    seen: Set[tuple] = set()
+    # Exact set of 64-bit fingerprints; membership is a single int hash, so a
+    # Bloom pre-filter in front of it would only add work
+    seen: Set[int] = set()
     final = []
 
     for source in sources:
         for job in source:
+            if not job.get("title"):
+                continue
+            normalize_job(job)
             # Create unique identifier
-            uid = (
-                str(job.get("title", "")).lower().strip(),
-                str(job.get("company", "")).lower().strip(),
-                str(job.get("location", "")).lower().strip()
+            uid = job_fingerprint(
+                job["_title_lc"].strip(),
+                job["_company_lc"].strip(),
+                job["_location_lc"].strip()
             )
             
-            if uid not in seen and job.get("title"):
+            if uid not in seen:
                 seen.add(uid)
                 final.append(job)
 
     return final
 
 
+# Titles at or above this similarity (0-100) within one company and
+# location are treated as the same posting
+FUZZY_TITLE_THRESHOLD = 92
+
+
+def title_similarity(a: str, b: str, score_cutoff: float = 0) -> float:
+    """
+    Whole-string similarity of two normalized titles on a 0-100 scale.
+
+    Deliberately not token-set: "senior software engineer" contains every
+    token of "software engineer" but is a different posting.
+    """
+    if fuzz is not None:
+        return fuzz.ratio(a, b, score_cutoff=score_cutoff)
+    ratio = 100 * difflib.SequenceMatcher(None, a, b).ratio()
+    return ratio if ratio >= score_cutoff else 0
+
+
+def collapse_near_duplicates(jobs: List[Dict[str, Any]], threshold: float = FUZZY_TITLE_THRESHOLD) -> List[Dict[str, Any]]:
+    """
+    Drop postings whose title nearly matches an earlier one from the same
+    company and location, e.g. the same job listed by two aggregators.
+    Jobs without a known company are never merged.
+
+    >>> jobs = [{"title": t, "company": "Acme", "location": "Pune"} for t in
+    ...         ("Software Engineer", "Senior Software Engineer", "Software Engineer.")]
+    >>> [job["title"] for job in collapse_near_duplicates(jobs)]
+    ['Software Engineer', 'Senior Software Engineer']
+    """
+    buckets: Dict[tuple, List[str]] = {}
+    final = []
+
+    for job in jobs:
+        normalize_job(job)
+        company = job["_company_lc"].strip()
+        if company in NULL_VALUES:
+            final.append(job)
+            continue
+
+        # Punctuation is noise here ("Sr. Engineer" vs "Sr Engineer")
+        title = " ".join("".join(ch if ch.isalnum() else " " for ch in job["_title_lc"]).split())
+        kept_titles = buckets.setdefault((company, job["_location_lc"].strip()), [])
+        if any(title_similarity(title, kept, score_cutoff=threshold) for kept in kept_titles):
+            continue
+        kept_titles.append(title)
+        final.append(job)
+
+    return final
+
+
 # -----------------------------
-# RELEVANCE SCORING
+# PROFILE TERMS
 # -----------------------------
-def score_relevance(job: Dict[str, Any], profile: Dict[str, Any]) -> int:
-    """Score job relevance based on profile match."""
-    score = 0
-    
-    job_title = str(job.get("title", "")).lower()
-    job_desc = str(job.get("description", "")).lower()
-    
-    # Check role match (highest weight)
+# [title, description, either] weights for each profile term bucket
+TERM_WEIGHTS = {
+    "role": (15, 7, 0),
+    "skills": (10, 4, 0),
+    "certs": (0, 0, 8),
+    "degrees": (0, 0, 6),
+    "languages": (0, 4, 0),
+}
+
+# Scoring stages in descending weight order, so jobs that cannot reach
+# min_score are pruned before the cheaper, lower-weight checks
+SCORING_STAGES = ("role", "skills", "location", "certs", "degrees", "experience", "languages")
+
+# Title keywords that signal each experience band
+EXPERIENCE_BAND_KEYWORDS = {
+    "senior": ("senior", "lead"),
+    "mid": ("mid", "intermediate"),
+    "junior": ("junior", "entry", "fresher"),
+}
+
+
+class TermMatcher:
+    """
+    Finds every profile term in a piece of text in a single pass.
+
+    Each term carries [title, description, either] weights; "either" weights
+    are awarded once when the term appears in the title or the description.
+    Uses an Aho-Corasick automaton when pyahocorasick is installed and falls
+    back to one substring check per term otherwise. Matching is deliberately
+    exact: fuzzy partial_ratio scoring (rapidfuzz.process.cdist) is much
+    slower on these texts and would change which jobs qualify.
+    """
+
+    def __init__(self, weights: Dict[str, List[int]]):
+        self.weights = weights
+        # Upper bound on what this matcher can add to a job's score
+        self.max_gain = sum(sum(w) for w in weights.values())
+        # Skip scanning a field no weight depends on
+        self.uses_title = any(w[0] or w[2] for w in weights.values())
+        self.uses_desc = any(w[1] or w[2] for w in weights.values())
+        self._automaton = None
+        if ahocorasick is not None and self.weights:
+            automaton = ahocorasick.Automaton()
+            for term in self.weights:
+                automaton.add_word(term, term)
+            automaton.make_automaton()
+            self._automaton = automaton
+
+    def find(self, text: str) -> Set[str]:
+        """Return the set of profile terms occurring in text."""
+        return self.find_batch([text])[0]
+
+    def find_batch(self, texts: List[str]) -> List[Set[str]]:
+        """
+        Return the matched terms for each text using one scan over all of them.
+
+        Texts are joined with NUL separators so the automaton (or str.find)
+        walks a single buffer; hit offsets are mapped back with bisect.
+        """
+        hits: List[Set[str]] = [set() for _ in texts]
+        if not texts or not self.weights:
+            return hits
+
+        starts = []
+        offset = 0
+        for text in texts:
+            starts.append(offset)
+            offset += len(text) + 1
+        blob = "\x00".join(texts)
+
+        if self._automaton is not None:
+            for end, term in self._automaton.iter(blob):
+                hits[bisect_right(starts, end) - 1].add(term)
+            return hits
+
+        # Without the automaton, per-term str.find that jumps to the next text
+        # after a hit beats a single alternation regex: re has to report every
+        # occurrence (and overlapping terms need a lookahead re2 can't express),
+        # while this loop touches at most one hit per (term, text).
+        for term in self.weights:
+            pos = blob.find(term)
+            while pos != -1:
+                idx = bisect_right(starts, pos) - 1
+                hits[idx].add(term)
+                # Skip to the next text once this one has matched
+                pos = blob.find(term, starts[idx + 1]) if idx + 1 < len(starts) else -1
+        return hits
+
+    def score(self, in_title: Set[str], in_desc: Set[str]) -> int:
+        """Sum term weights for the terms matched in the title and description."""
+        score = 0
+        for term in in_title | in_desc:
+            title_w, desc_w, either_w = self.weights[term]
+            if term in in_title:
+                score += title_w
+            if term in in_desc:
+                score += desc_w
+            score += either_w
+        return score
+
+
+@dataclass
+class ProfileTerms:
+    """Lowercased, validated profile terms used to score every job."""
+    role: str = ""
+    skills: List[str] = field(default_factory=list)
+    certs: List[str] = field(default_factory=list)
+    degrees: List[str] = field(default_factory=list)
+    languages: List[str] = field(default_factory=list)
+    location: str = ""
+    location_parts: List[str] = field(default_factory=list)
+    # Title keywords for the candidate's experience band, parsed once
+    exp_keywords: Tuple[str, ...] = ()
+    buckets: Dict[str, TermMatcher] = field(default_factory=dict)
+
+
+def build_profile_matcher(profile: Dict[str, Any]) -> ProfileTerms:
+    """Normalize profile terms once so scoring each job only runs substring tests."""
+    terms = ProfileTerms()
+
+    # Role (highest weight)
     role = profile.get("role", "")
-    if role and isinstance(role, str) and role.lower() not in ['null', 'none', '']:
-        role_lower = role.lower()
-        if role_lower in job_title:
-            score += 15
-        if role_lower in job_desc:
-            score += 7
+    if role and isinstance(role, str) and role.lower() not in NULL_VALUES:
+        terms.role = role.lower()
     
-    # Check skills match
+    # Skills
     skills = profile.get("skills", [])
     if isinstance(skills, list):
         for skill in skills:
-            if isinstance(skill, str) and skill.lower() not in ['null', 'none', '']:
-                skill_lower = skill.lower()
-                if skill_lower in job_title:
-                    score += 10
-                if skill_lower in job_desc:
-                    score += 4
+            if isinstance(skill, str) and skill.lower() not in NULL_VALUES:
+                terms.skills.append(skill.lower())
             elif isinstance(skill, dict):
                 # Handle skill objects with name/level properties
                 skill_name = str(skill.get('name', skill.get('skill', ''))).lower()
-                if skill_name and skill_name not in ['null', 'none', '']:
-                    if skill_name in job_title:
-                        score += 10
-                    if skill_name in job_desc:
-                        score += 4
+                if skill_name and skill_name not in NULL_VALUES:
+                    terms.skills.append(skill_name)
     
-    # Check certifications match
+    # Certifications
     certifications = profile.get("certifications", [])
     if isinstance(certifications, list):
         for cert in certifications:
-            if isinstance(cert, str) and cert.lower() not in ['null', 'none', '']:
-                cert_lower = cert.lower()
-                if cert_lower in job_title or cert_lower in job_desc:
-                    score += 8
+            if isinstance(cert, str) and cert.lower() not in NULL_VALUES:
+                terms.certs.append(cert.lower())
             elif isinstance(cert, dict):
                 # Handle cert objects
                 cert_name = str(cert.get('name', cert.get('certification', ''))).lower()
-                if cert_name and cert_name not in ['null', 'none', '']:
-                    if cert_name in job_title or cert_name in job_desc:
-                        score += 8
+                if cert_name and cert_name not in NULL_VALUES:
+                    terms.certs.append(cert_name)
     
-    # Check education/degree match
+    # Education/degree
     education = profile.get("education", [])
     if isinstance(education, list):
         for edu in education:
@@ -275,106 +603,187 @@ def score_relevance(job: Dict[str, Any], profile: Dict[str, Any]) -> int:
                 degree = edu.get("degree", "")
                 if degree and isinstance(degree, str):
                     degree_lower = degree.lower()
-                    if degree_lower and degree_lower not in ['null', 'none', '']:
-                        if degree_lower in job_title or degree_lower in job_desc:
-                            score += 6
-    
-    # Check experience level match
-    experience_years = profile.get("experience_years")
-    if experience_years and str(experience_years).lower() not in ['null', 'none', '0']:
-        try:
-            years = int(experience_years)
-            # Check if job mentions experience requirements
-            if years >= 5 and ('senior' in job_title or 'lead' in job_title):
-                score += 5
-            elif years >= 2 and years < 5 and ('mid' in job_title or 'intermediate' in job_title):
-                score += 5
-            elif years < 2 and ('junior' in job_title or 'entry' in job_title or 'fresher' in job_title):
-                score += 5
-        except:
-            pass
-    
-    # Check location match
-    profile_location = str(profile.get("location", "")).lower() if profile.get("location") else ""
-    job_location = str(job.get("location", "")).lower() if job.get("location") else ""
-    if profile_location and profile_location not in ['null', 'none', '']:
-        if profile_location in job_location:
-            score += 8
-        # Partial match for city/state
-        location_parts = profile_location.split()
-        for part in location_parts:
-            if len(part) > 2 and part in job_location:
-                score += 3
-                break
+                    if degree_lower and degree_lower not in NULL_VALUES:
+                        terms.degrees.append(degree_lower)
     
-    # Check languages if specified
+    # Languages
     languages = profile.get("languages", [])
     if isinstance(languages, list):
         for lang in languages:
-            if isinstance(lang, str) and lang.lower() not in ['null', 'none', 'english']:
-                lang_lower = lang.lower()
-                if lang_lower in job_desc:
-                    score += 4
+            if isinstance(lang, str) and lang.lower() not in IGNORED_LANGUAGES:
+                terms.languages.append(lang.lower())
             elif isinstance(lang, dict):
                 # Handle language objects with language/proficiency properties
                 lang_name = str(lang.get('language', lang.get('name', ''))).lower()
-                if lang_name and lang_name not in ['null', 'none', 'english']:
-                    if lang_name in job_desc:
-                        score += 4
+                if lang_name and lang_name not in IGNORED_LANGUAGES:
+                    terms.languages.append(lang_name)
+    
+    # Location
+    profile_location = str(profile.get("location", "")).lower() if profile.get("location") else ""
+    if profile_location and profile_location not in NULL_VALUES:
+        terms.location = profile_location
+        terms.location_parts = [part for part in profile_location.split() if len(part) > 2]
+    
+    # Experience band
+    experience_years = profile.get("experience_years")
+    if experience_years and str(experience_years).lower() not in NULL_YEARS:
+        try:
+            years = int(experience_years)
+            if years >= 5:
+                terms.exp_keywords = EXPERIENCE_BAND_KEYWORDS["senior"]
+            elif years >= 2:
+                terms.exp_keywords = EXPERIENCE_BAND_KEYWORDS["mid"]
+            else:
+                terms.exp_keywords = EXPERIENCE_BAND_KEYWORDS["junior"]
+        except (TypeError, ValueError):
+            pass
+    
+    # One matcher per non-empty bucket; repeated terms accumulate weight
+    for name, bucket in (
+        ("role", [terms.role] if terms.role else []),
+        ("skills", terms.skills),
+        ("certs", terms.certs),
+        ("degrees", terms.degrees),
+        ("languages", terms.languages),
+    ):
+        weights: Dict[str, List[int]] = {}
+        for term in bucket:
+            w = weights.setdefault(term, [0, 0, 0])
+            for i, weight in enumerate(TERM_WEIGHTS[name]):
+                w[i] += weight
+        if weights:
+            terms.buckets[name] = TermMatcher(weights)
+
+    return terms
+
+
+# -----------------------------
+# RELEVANCE SCORING
+# -----------------------------
+def score_jobs(jobs: List[Dict[str, Any]], terms: ProfileTerms, min_score: Optional[int] = None) -> List[int]:
+    """
+    Score a batch of jobs against precomputed profile terms.
+
+    Stages run in SCORING_STAGES order. When min_score is given, jobs that can
+    no longer reach it skip the remaining stages and keep their partial score,
+    which is below min_score by construction.
+
+    Scoring stays on the calling thread: the automaton iterator and the stage
+    loops hold the GIL, so a thread pool adds overhead without parallelism, and
+    a search returns at most a few hundred jobs.
+    """
+    for job in jobs:
+        normalize_job(job)
+    job_titles = [job["_title_lc"] for job in jobs]
+    job_descs = [job["_description_lc"] for job in jobs]
+    
+    gains = {name: matcher.max_gain for name, matcher in terms.buckets.items()}
+    gains["location"] = 8 + 3 if terms.location else 0
+    gains["experience"] = 5 if terms.exp_keywords else 0
+    
+    scores = [0] * len(jobs)
+    active = list(range(len(jobs)))
+    remaining = sum(gains.values())
+    
+    for stage in SCORING_STAGES:
+        gain = gains.get(stage, 0)
+        if not active or not gain:
+            continue
+        remaining -= gain
+        
+        if stage == "location":
+            # Check location match
+            for i in active:
+                job_location = jobs[i]["_location_lc"]
+                if terms.location in job_location:
+                    scores[i] += 8
+                # Partial match for city/state
+                for part in terms.location_parts:
+                    if part in job_location:
+                        scores[i] += 3
+                        break
+        elif stage == "experience":
+            # Check experience level match
+            for i in active:
+                if any(k in job_titles[i] for k in terms.exp_keywords):
+                    scores[i] += 5
+        else:
+            # Role, skills, certifications, education or languages
+            matcher = terms.buckets[stage]
+            no_hits = [set()] * len(active)
+            title_hits = matcher.find_batch([job_titles[i] for i in active]) if matcher.uses_title else no_hits
+            desc_hits = matcher.find_batch([job_descs[i] for i in active]) if matcher.uses_desc else no_hits
+            for i, in_title, in_desc in zip(active, title_hits, desc_hits):
+                scores[i] += matcher.score(in_title, in_desc)
+        
+        if min_score is not None:
+            active = [i for i in active if scores[i] + remaining >= min_score]
     
-    return score
+    return scores
+
+
+def score_relevance(job: Dict[str, Any], terms: ProfileTerms) -> int:
+    """Score a single job's relevance against precomputed profile terms."""
+    return score_jobs([job], terms)[0]
 
 
 # -----------------------------
 # MAIN FUNCTION
 # -----------------------------
-def search_jobs(profile: Dict[str, Any], min_score: int = 5) -> List[Dict[str, Any]]:
+def search_jobs(profile: Dict[str, Any], min_score: int = 5, top_k: Optional[int] = 100) -> List[Dict[str, Any]]:
     """
     Search for jobs across multiple sources based on profile.
     
     Args:
         profile: User profile dict with role, skills, location, etc.
         min_score: Minimum relevance score to include job
+        top_k: Maximum number of jobs to return (None for all)
     
     Returns:
         List of relevant job postings sorted by relevance
     """
-    print("🔍 Searching jobs for profile...")
+    logger.info("Searching jobs for profile")
     
     # Generate keywords
     keywords = generate_keywords(profile)
-    print(f"📋 Keywords: {keywords}")
+    # Keywords and location come from the user's profile; debug only
+    logger.debug("Keywords: %s", keywords)
     
     # Get location from profile with fallback
     location = profile.get("location", "")
-    if not location or (isinstance(location, str) and location.lower() in ['null', 'none', '']):
+    if not location or (isinstance(location, str) and location.lower() in NULL_VALUES):
         location = "India"  # Default fallback
     else:
         location = str(location)  # Ensure it's a string
-    print(f"📍 Location: {location}")
+    logger.debug("Location: %s", location)
     
-    # Fetch from all sources
-    adzuna_jobs = fetch_adzuna(keywords, location)
-    jooble_jobs = fetch_jooble(keywords, location)
-    serpapi_jobs = fetch_serpapi(keywords, location)
+    # Fetch from all sources in parallel
+    adzuna_jobs, jooble_jobs, serpapi_jobs = fetch_all_sources(keywords[:KEYWORDS_PER_SOURCE], location)
     
-    print(f"✅ Fetched: {len(adzuna_jobs)} from Adzuna, {len(jooble_jobs)} from Jooble, {len(serpapi_jobs)} from SerpAPI")
+    logger.info("Fetched: %d from Adzuna, %d from Jooble, %d from SerpAPI",
+                len(adzuna_jobs), len(jooble_jobs), len(serpapi_jobs))
     
     # Merge and deduplicate
-    all_jobs = merge_results(adzuna_jobs, jooble_jobs, serpapi_jobs)
-    print(f"🔄 Merged to {len(all_jobs)} unique jobs")
+    all_jobs = collapse_near_duplicates(merge_results(adzuna_jobs, jooble_jobs, serpapi_jobs))
+    logger.info("Merged to %d unique jobs", len(all_jobs))
     
     # Score and filter jobs
+    terms = build_profile_matcher(profile)
     scored_jobs = []
-    for job in all_jobs:
-        relevance = score_relevance(job, profile)
+    for job, relevance in zip(all_jobs, score_jobs(all_jobs, terms, min_score)):
         if relevance >= min_score:
             job["relevance_score"] = relevance
             scored_jobs.append(job)
     
-    # Sort by relevance
-    scored_jobs.sort(key=lambda x: x["relevance_score"], reverse=True)
+    # Rank by relevance; nlargest is stable, so ties keep merge order
+    if top_k is None:
+        scored_jobs.sort(key=lambda x: x["relevance_score"], reverse=True)
+    else:
+        scored_jobs = heapq.nlargest(top_k, scored_jobs, key=lambda x: x["relevance_score"])
+    
+    for job in scored_jobs:
+        strip_normalized(job)
     
-    print(f"✨ Returning {len(scored_jobs)} relevant jobs (min score: {min_score})")
+    logger.info("Returning %d relevant jobs (min score: %d)", len(scored_jobs), min_score)
     
     return scored_jobs
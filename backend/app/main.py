@@ -1,18 +1,36 @@
 # jobsathi_api.py
 # ASR + LLM-powered resume builder backend
 
-from fastapi import FastAPI, File, UploadFile, HTTPException, Form, Body
+from fastapi import FastAPI, HTTPException, Body, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response, JSONResponse, StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+import io
+import logging
+import logging.handlers
+import queue
+import threading
 import tempfile
 import os
+import gc
+import time
 import asyncio
+from concurrent.futures import ThreadPoolExecutor
+# Must be set before torch initializes CUDA; avoids fragmentation in the
+# long-lived caching allocator
+os.environ.setdefault("PYTORCH_CUDA_ALLOC_CONF", "expandable_segments:True")
 import torch
 import torchaudio
 from transformers import AutoModel
 import httpx
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import json
+import orjson
+import re
+import copy
+import hashlib
+import hmac
+from cachetools import TTLCache, LRUCache
 import google.generativeai as genai
 from datetime import datetime
 import uuid
@@ -23,12 +41,49 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_LEFT, TA_CENTER
 from .job_search import search_jobs
+from .session_store import SessionStore
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+    from python_multipart.exceptions import MultipartParseError
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+    from multipart.exceptions import MultipartParseError
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-app = FastAPI(title="JobSathi API - Resume Builder", version="6.0.0")
+class OrjsonResponse(JSONResponse):
+    """JSONResponse encoded with orjson, the app-wide default response class.
+    Defined here rather than using fastapi.responses.ORJSONResponse, which
+    newer FastAPI releases deprecate."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+app = FastAPI(title="JobSathi API - Resume Builder", version="6.0.0", default_response_class=OrjsonResponse)
+
+# Logging: the QueueHandler formats each record on the calling thread (that
+# is what QueueHandler.prepare() does), then only enqueues it; the blocking
+# stdout write happens on the listener thread
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+logger = logging.getLogger("jobsathi")
+logger.setLevel(LOG_LEVEL)
+logger.propagate = False
+_log_queue = queue.SimpleQueue()
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_stream)
+
+@app.on_event("startup")
+def start_logging():
+    _log_listener.start()
+
+@app.on_event("shutdown")
+def stop_logging():
+    # Flushes anything still queued
+    _log_listener.stop()
 
 # CORS
 app.add_middleware(
@@ -48,10 +103,31 @@ if not GEMINI_API_KEY:
 ASR_MODEL_ID = os.getenv("ASR_MODEL_ID", "ai4bharat/indic-conformer-600m-multilingual")
 DEVICE_CONFIG = os.getenv("DEVICE", "auto")
 DEVICE = "cuda" if DEVICE_CONFIG == "auto" and torch.cuda.is_available() else "cpu"
+# CPU autocast to bfloat16 only pays off on hosts with native BF16 (AVX512-BF16/AMX)
+ASR_CPU_BF16 = os.getenv("ASR_CPU_BF16", "false").lower() == "true"
+# torch.compile the ASR model at startup: "auto" compiles on CUDA only
+ASR_COMPILE_CONFIG = os.getenv("ASR_COMPILE", "auto").lower()
+ASR_COMPILE = ASR_COMPILE_CONFIG == "true" or (ASR_COMPILE_CONFIG == "auto" and DEVICE == "cuda")
+
+# Reject audio uploads larger than this (bytes)
+MAX_AUDIO_BYTES = int(os.getenv("MAX_AUDIO_BYTES", str(25 * 1024 * 1024)))
+# Uploads up to this size are decoded straight from memory; larger ones spill to disk
+AUDIO_SPOOL_BYTES = int(os.getenv("AUDIO_SPOOL_BYTES", str(8 * 1024 * 1024)))
+
+# Shared secret for /admin/* routes, sent as X-Admin-Token; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
 
 # Database directory for storing responses
 DATABASE_DIR = os.path.join(os.path.dirname(__file__), "database")
 os.makedirs(DATABASE_DIR, exist_ok=True)
+# Shared by every worker process, so sessions survive `uvicorn --workers N`.
+# Kept out of DATABASE_DIR: it holds every in-progress interview, and files
+# there are reachable through /download_resume
+SESSION_DIR = os.path.join(os.path.dirname(__file__), "sessions")
+os.makedirs(SESSION_DIR, exist_ok=True)
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", os.path.join(SESSION_DIR, "sessions.db"))
+# Sessions never sent to /build_profile are dropped after this many seconds
+SESSION_MAX_AGE = int(os.getenv("SESSION_MAX_AGE", str(24 * 3600)))
 
 # Configure Gemini
 genai.configure(api_key=GEMINI_API_KEY)
@@ -65,6 +141,23 @@ GENERATION_CONFIG = {
     "response_mime_type": "application/json",
 }
 
+# Parsed Gemini responses keyed by SHA-256 of the full prompt; resubmitted
+# answers and regenerated profiles skip the API round trip
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", "3600"))
+_llm_cache = TTLCache(maxsize=2048, ttl=LLM_CACHE_TTL)
+# Cache key -> future for prompts currently being generated
+_llm_inflight: Dict[str, asyncio.Future] = {}
+
+# Freshly built resume PDFs, so the download that follows /build_profile is
+# served from memory instead of re-reading the file just written
+PDF_CACHE_TTL = int(os.getenv("PDF_CACHE_TTL", "600"))
+_pdf_cache = TTLCache(maxsize=256, ttl=PDF_CACHE_TTL)
+
+# /search_jobs results keyed by a fingerprint of the profile, so a client
+# polling with the same profile doesn't re-run fetching and scoring
+JOBS_CACHE_TTL = int(os.getenv("JOBS_CACHE_TTL", "300"))
+_jobs_cache = TTLCache(maxsize=512, ttl=JOBS_CACHE_TTL)
+
 # Initialize the model
 # Using gemini-1.5-flash as it is fast and cost-effective
 model = genai.GenerativeModel(
@@ -76,10 +169,20 @@ model = genai.GenerativeModel(
 # Globals and locks
 # -----------------------
 _asr_model = None
-asr_lock = asyncio.Lock()
+# Uncompiled module behind a torch.compile'd _asr_model, for eager fallback
+_asr_eager = None
+_asr_stream = None
+# Single ASR worker: requests queue up FIFO behind one thread, which keeps
+# inference serialized (the model is not documented as thread-safe) without
+# running the forward pass on the event loop
+_asr_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="asr")
+
+# Bounded pool for blocking decode/resample/PDF/session-store work, so it
+# stays off the event loop without concurrent requests thrashing every core
+_cpu_pool = ThreadPoolExecutor(max_workers=min(4, os.cpu_count() or 1))
 
-# Session storage: {session_id: {"responses": [], "metadata": {}}}
-session_storage = {}
+# Interview sessions: {session_id: {"responses": [], "metadata": {}}}
+session_store = SessionStore(SESSION_DB_PATH, max_age=SESSION_MAX_AGE)
 
 # Language maps
 LANGUAGE_NAME = {
@@ -94,152 +197,400 @@ LANGUAGE_NAME = {
 # -----------------------
 # Utility functions
 # -----------------------
+# Resample transforms keyed by (orig_sr, target_sr); building the sinc kernel
+# is the expensive part, and browser mics almost always send 48 kHz. Bounded,
+# since the key is whatever rate the client uploads and kernels live on DEVICE
+_resamplers: LRUCache = LRUCache(maxsize=8)
+# Lookups reorder the LRU, and decode runs on several _cpu_pool threads
+_resamplers_lock = threading.Lock()
+
+def get_resampler(orig_sr, target_sr):
+    key = (orig_sr, target_sr)
+    with _resamplers_lock:
+        resampler = _resamplers.get(key)
+    if resampler is None:
+        resampler = torchaudio.transforms.Resample(orig_freq=orig_sr, new_freq=target_sr).to(DEVICE)
+        with _resamplers_lock:
+            resampler = _resamplers.setdefault(key, resampler)
+    return resampler
+
+def to_device(tensor):
+    """Move a tensor to DEVICE; host tensors go through pinned memory so the
+    copy is asynchronous and overlaps with compute."""
+    if DEVICE == "cuda" and tensor.device.type == "cpu":
+        if not tensor.is_pinned():
+            tensor = tensor.pin_memory()
+        return tensor.to(DEVICE, non_blocking=True)
+    return tensor.to(DEVICE)
+
 def preprocess_audio(waveform, sample_rate, target_sr=16000):
     # convert to mono
     if waveform.ndim > 1:
         waveform = waveform.mean(dim=0, keepdim=True)
     # resample if required
     if sample_rate != target_sr:
-        try:
-            waveform = torchaudio.functional.resample(waveform, sample_rate, target_sr)
-        except Exception as e:
-            print(f"Resample failed: {e}, trying transforms.Resample")
-            resampler = torchaudio.transforms.Resample(orig_freq=sample_rate, new_freq=target_sr)
-            waveform = resampler(waveform)
+        resampler = get_resampler(sample_rate, target_sr)
+        waveform = resampler(to_device(waveform))
     waveform = waveform.to(torch.float32)
     if waveform.ndim == 1:
         waveform = waveform.unsqueeze(0)
+    if DEVICE == "cuda" and waveform.device.type == "cpu":
+        # Pin here, on the pool thread, so the ASR worker only issues the copy
+        waveform = waveform.pin_memory()
     return waveform
 
+async def run_in_cpu_pool(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_cpu_pool, fn, *args)
+
+def write_bytes_file(path, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+
+# Anything outside this set becomes "_": no path separators or quotes, and
+# the name stays ASCII so it can go in a Content-Disposition header
+_NAME_SANITIZE = re.compile(r"[^A-Za-z0-9_-]+")
+
+def filename_safe_name(name: Any) -> str:
+    """Profile name as a bounded, filesystem-safe filename component."""
+    safe = _NAME_SANITIZE.sub("_", str(name or "")).strip("_")[:64]
+    return safe or "unknown"
+
+def write_json_file(path, data):
+    # orjson encodes straight to UTF-8 bytes, so one buffered write
+    with open(path, "wb") as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+
 # -----------------------
 # ASR model lifecycle
 # -----------------------
-async def load_asr_model():
-    global _asr_model
-    async with asr_lock:
-        if _asr_model is None:
-            print("Loading ASR model...")
-            _asr_model = AutoModel.from_pretrained(ASR_MODEL_ID, trust_remote_code=True).to(DEVICE)
-            print("ASR model loaded")
+def load_asr_model():
+    global _asr_model, _asr_stream
+    if _asr_model is None:
+        logger.info("Loading ASR model %s on %s", ASR_MODEL_ID, DEVICE)
+        _asr_model = AutoModel.from_pretrained(ASR_MODEL_ID, trust_remote_code=True).to(DEVICE)
+        _asr_model.eval()
+        if DEVICE == "cuda":
+            _asr_stream = torch.cuda.Stream()
+        logger.info("ASR model loaded")
     return _asr_model
 
-def unload_asr_model():
-    global _asr_model
-    if _asr_model:
-        print("Unloading ASR model to free memory")
-        del _asr_model
-        _asr_model = None
-        torch.cuda.empty_cache()
+def _asr_autocast():
+    if DEVICE == "cuda":
+        return torch.autocast(device_type="cuda", dtype=torch.float16)
+    return torch.autocast(device_type="cpu", dtype=torch.bfloat16, enabled=ASR_CPU_BF16)
+
+def _asr_forward(model, audio_tensor, source_lang):
+    if _asr_stream is None:
+        with _asr_autocast():
+            return model(to_device(audio_tensor), source_lang, "rnnt")
+    # Run on a dedicated stream so interleaved requests don't queue behind
+    # each other on the default stream; the host-to-device copy is enqueued
+    # on the same stream, ahead of the forward pass
+    _asr_stream.wait_stream(torch.cuda.current_stream())
+    with torch.cuda.stream(_asr_stream), _asr_autocast():
+        out = model(to_device(audio_tensor), source_lang, "rnnt")
+    _asr_stream.synchronize()
+    return out
+
+def _warm_up(model):
+    # Two lengths so the dynamic-shape cache is primed, not just one shape
+    with torch.inference_mode():
+        for seconds in (1, 5):
+            _asr_forward(model, torch.zeros(1, 16000 * seconds, device=DEVICE), "hi")
+
+def _prepare_asr_model():
+    global _asr_model, _asr_eager
+    try:
+        model = load_asr_model()
+    except Exception:
+        # Don't take the rest of the API down with it; /transcribe retries
+        # the load lazily
+        logger.exception("ASR model failed to load at startup")
+        return
+    if ASR_COMPILE:
+        try:
+            # Default mode, not "reduce-overhead": CUDA graphs are recorded
+            # per input shape, and every clip has a different length
+            compiled = torch.compile(model, fullgraph=False, dynamic=True)
+            _warm_up(compiled)
+            _asr_model, _asr_eager = compiled, model
+            logger.info("ASR model compiled and warmed up")
+            return
+        except Exception as e:
+            # The remote-code forward may not compile; eager still works
+            logger.warning("ASR compile failed: %s, falling back to eager", e)
+    try:
+        _warm_up(model)
+        logger.info("ASR model warmed up")
+    except Exception as e:
+        logger.warning("ASR warm-up failed: %s", e)
+
+@app.on_event("startup")
+async def warm_asr_model():
+    """Load (and optionally compile) the ASR model before serving, and run
+    dummy audio through it so compilation and kernel selection happen here,
+    not on the first request."""
+    # On the ASR worker itself: compiled-graph state is per thread, so warm
+    # the thread that will serve requests
+    await asyncio.get_running_loop().run_in_executor(_asr_executor, _prepare_asr_model)
+
+def _transcribe_sync(audio_tensor, source_lang):
+    # Runs on the ASR worker thread; inference_mode/autocast are thread-local
+    global _asr_model, _asr_eager
+    model = _asr_model or load_asr_model()
+    with torch.inference_mode():
+        if _asr_eager is None:
+            return _asr_forward(model, audio_tensor, source_lang)
+        try:
+            return _asr_forward(model, audio_tensor, source_lang)
+        except Exception as e:
+            compile_error = e
+        # A recompile for a new shape can fail; if eager handles the same
+        # input, the compiled module is at fault, so stop using it
+        out = _asr_forward(_asr_eager, audio_tensor, source_lang)
+        logger.warning("Compiled ASR model failed (%s), switching to eager", compile_error)
+        _asr_model, _asr_eager = _asr_eager, None
+        return out
 
 async def run_asr(audio_tensor, source_lang):
-    model = await load_asr_model()
+    loop = asyncio.get_running_loop()
     try:
-        with torch.inference_mode():
-            out = model(audio_tensor, source_lang, "rnnt")
-            if isinstance(out, dict):
-                return out.get("text", "").strip()
-            return str(out).strip()
+        out = await loop.run_in_executor(_asr_executor, _transcribe_sync, audio_tensor, source_lang)
+        if isinstance(out, dict):
+            return out.get("text", "").strip()
+        return str(out).strip()
     except Exception as e:
         raise RuntimeError(f"ASR failed: {e}")
 
 # -----------------------
-# Audio loader helper
+# Audio upload helpers
 # -----------------------
-def save_temp_file_and_load(audio_bytes, filename_hint):
-    tmp_path = None
-    with tempfile.NamedTemporaryFile(delete=False, suffix=os.path.splitext(filename_hint)[1] or ".wav") as tmp:
-        tmp.write(audio_bytes)
-        tmp_path = tmp.name
+class AudioUploadStream:
+    """
+    Incremental multipart/form-data parser for /transcribe.
+
+    The "audio" part is written into a spooled buffer as chunks arrive: it
+    stays in memory for typical clips and only spills to disk past
+    AUDIO_SPOOL_BYTES. Other parts are small form fields and are collected
+    into `fields`.
+    """
+
+    def __init__(self, boundary: bytes):
+        self.fields: Dict[str, str] = {}
+        self.filename = ""
+        self.audio = None
+        self.size = 0
+        self._headers: Dict[bytes, bytes] = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._name = ""
+        self._value = bytearray()
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+        })
+
+    def write(self, chunk: bytes):
+        self._parser.write(chunk)
+
+    def finalize(self):
+        self._parser.finalize()
+
+    def cleanup(self):
+        if self.audio is not None:
+            self.audio.close()
+            self.audio = None
+
+    def _on_part_begin(self):
+        self._headers = {}
+        self._value = bytearray()
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        _, params = parse_options_header(self._headers.get(b"content-disposition", b""))
+        self._name = params.get(b"name", b"").decode("latin-1")
+        if self._name == "audio":
+            if self.audio is not None:
+                # A second buffer would replace (and leak) the first
+                raise HTTPException(status_code=400, detail="Expected a single audio file")
+            self.filename = params.get(b"filename", b"").decode("utf-8", "replace")
+            self.audio = tempfile.SpooledTemporaryFile(max_size=AUDIO_SPOOL_BYTES)
+
+    def _on_part_data(self, data, start, end):
+        if self._name == "audio" and self.audio is not None:
+            self.audio.write(data[start:end])
+            self.size += end - start
+        else:
+            self._value += data[start:end]
+
+    def _on_part_end(self):
+        if self._name and self._name != "audio":
+            self.fields[self._name] = self._value.decode("utf-8", "replace")
+
+
+async def receive_audio_upload(request: Request) -> AudioUploadStream:
+    """Stream a multipart /transcribe request body into an AudioUploadStream."""
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MAX_AUDIO_BYTES:
+        raise HTTPException(status_code=413, detail="Audio file too large")
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type.lower() != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=400, detail="Expected multipart/form-data upload")
+
+    upload = AudioUploadStream(boundary)
+    received = 0
     try:
+        async for chunk in request.stream():
+            # Count the whole body, not just the audio part: a chunked upload
+            # has no Content-Length, and any other part is buffered in memory
+            received += len(chunk)
+            if received > MAX_AUDIO_BYTES:
+                raise HTTPException(status_code=413, detail="Audio file too large")
+            upload.write(chunk)
+        upload.finalize()
+    except MultipartParseError:
+        upload.cleanup()
+        raise HTTPException(status_code=400, detail="Malformed multipart/form-data upload")
+    except Exception:
+        upload.cleanup()
+        raise
+    return upload
+
+
+def load_audio_file(fileobj, filename=""):
+    """Decode audio from an open file object, without a round trip through disk."""
+    fileobj.seek(0)
+    try:
+        waveform, sr = torchaudio.load(fileobj)
+        logger.debug("Loaded with torchaudio (auto): shape %s, sr %s", waveform.shape, sr)
+        return waveform, sr
+    except Exception as e:
+        error = e
+    # Container probing can fail on a stream; retry with the extension as a
+    # format hint (e.g. the frontend's webm/opus), then mp3
+    hint = os.path.splitext(filename)[1].lstrip(".").lower()
+    for fmt in dict.fromkeys(f for f in (hint, "mp3") if f):
+        logger.debug("torchaudio.load failed: %s. Trying %s format fallback.", error, fmt)
+        fileobj.seek(0)
         try:
-            waveform, sr = torchaudio.load(tmp_path)
-            print(f"Loaded with torchaudio (auto): shape {waveform.shape}, sr {sr}")
+            waveform, sr = torchaudio.load(fileobj, format=fmt)
+            logger.debug("Loaded as %s: shape %s, sr %s", fmt, waveform.shape, sr)
+            return waveform, sr
         except Exception as e:
-            print(f"torchaudio.load auto failed: {e}. Trying mp3 format fallback.")
-            waveform, sr = torchaudio.load(tmp_path, format="mp3")
-            print(f"Loaded as mp3: shape {waveform.shape}, sr {sr}")
-        return tmp_path, waveform, sr
-    except Exception as e:
-        raise
+            error = e
+    raise error
 
 # -----------------------
 # Endpoints
 # -----------------------
 
 @app.post("/transcribe")
-async def transcribe(audio: UploadFile = File(...), source_language: str = Form("hi")):
-    """ASR-only endpoint - returns transcribed text for frontend translation."""
-    print(f"Transcribe called with language: {source_language}, file: {audio.filename}")
-    if source_language not in LANGUAGE_NAME:
-        print(f"Unsupported language: {source_language}")
-        raise HTTPException(status_code=400, detail="Unsupported language")
-
-    audio_bytes = await audio.read()
-    print(f"Audio bytes length: {len(audio_bytes)}")
-    if not audio_bytes:
-        raise HTTPException(400, "Empty audio")
-
-    tmp_path = None
+async def transcribe(request: Request):
+    """
+    ASR-only endpoint - returns transcribed text for frontend translation.
+    Multipart form: audio (file), source_language (default "hi").
+    """
+    upload = await receive_audio_upload(request)
+    source_language = upload.fields.get("source_language", "hi")
+    logger.debug("Transcribe called with language: %s, file: %s", source_language, upload.filename)
     try:
-        tmp_path, waveform, sr = save_temp_file_and_load(audio_bytes, audio.filename)
-        waveform = preprocess_audio(waveform, sr)
-        print(f"Preprocessed waveform shape: {waveform.shape}")
+        language_label = LANGUAGE_NAME.get(source_language)
+        if language_label is None:
+            logger.info("Unsupported language: %s", source_language)
+            raise HTTPException(status_code=400, detail="Unsupported language")
+
+        logger.debug("Audio bytes length: %d", upload.size)
+        if upload.audio is None or not upload.size:
+            raise HTTPException(400, "Empty audio")
 
-        transcript = await run_asr(waveform.to(DEVICE), source_language)
-        print(f"ASR transcript: {transcript}")
+        waveform, sr = await run_in_cpu_pool(load_audio_file, upload.audio, upload.filename)
+        waveform = await run_in_cpu_pool(preprocess_audio, waveform, sr)
+        logger.debug("Preprocessed waveform shape: %s", waveform.shape)
+
+        transcript = await run_asr(waveform, source_language)
 
         if not transcript:
-            # unload_asr_model()  # TEMPORARILY COMMENTED OUT FOR SPEED IMPROVEMENT
             raise HTTPException(400, "ASR returned empty")
 
-        # unload_asr_model()  # TEMPORARILY COMMENTED OUT FOR SPEED IMPROVEMENT
         return {
             "status": "success",
             "data": {
                 "original_text": transcript,
                 "detected_language": source_language,
-                "language_label": LANGUAGE_NAME[source_language]
+                "language_label": language_label
             }
         }
     finally:
-        if tmp_path and os.path.exists(tmp_path):
-            os.unlink(tmp_path)
-            print(f"Temp file removed: {tmp_path}")
+        upload.cleanup()
 
 # -----------------------
 # LLM Integration
 # -----------------------
 
+# Common fake patterns
+FAKE_PATTERNS = {
+    "email": [
+        "example.com", "@example", "john@", "user@", "test@",
+        "sample@", "demo@", "placeholder@", "dummy@"
+    ],
+    "phone": [
+        "123-456-7890", "1234567890", "555-", "000-", "111-",
+        "+91-1234567890", "+1-123-456-7890"
+    ],
+    "company": [
+        "abc corporation", "xyz company", "example corp", "test company",
+        "sample ltd", "demo inc", "placeholder", "unknown company"
+    ],
+    "school": [
+        "university of xyz", "abc university", "example university",
+        "test school", "sample college", "xyz institute"
+    ],
+    "generic": [
+        "example", "sample", "test", "demo", "placeholder", "dummy",
+        "lorem ipsum", "n/a", "not applicable", "tbd", "to be determined"
+    ]
+}
+
+# One alternation per field type (its own patterns plus the generic ones), so
+# each value is checked with a single regex scan instead of a Python loop
+_FAKE_PATTERN_RE = {
+    field_type: re.compile("|".join(
+        re.escape(p) for p in dict.fromkeys(patterns + FAKE_PATTERNS["generic"])
+    ))
+    for field_type, patterns in FAKE_PATTERNS.items()
+}
+
+_WORD_RE = re.compile(r"\w+")
+
 def validate_and_clean_data(data: Dict[str, Any], user_text: str = "") -> Dict[str, Any]:
     """
     Validate and clean data to remove common fake/dummy patterns.
     Also validates against actual user responses to ensure data authenticity.
     Returns cleaned data with fake values replaced by null.
     """
-    # Common fake patterns
-    FAKE_PATTERNS = {
-        "email": [
-            "example.com", "@example", "john@", "user@", "test@",
-            "sample@", "demo@", "placeholder@", "dummy@"
-        ],
-        "phone": [
-            "123-456-7890", "1234567890", "555-", "000-", "111-",
-            "+91-1234567890", "+1-123-456-7890"
-        ],
-        "company": [
-            "abc corporation", "xyz company", "example corp", "test company",
-            "sample ltd", "demo inc", "placeholder", "unknown company"
-        ],
-        "school": [
-            "university of xyz", "abc university", "example university",
-            "test school", "sample college", "xyz institute"
-        ],
-        "generic": [
-            "example", "sample", "test", "demo", "placeholder", "dummy",
-            "lorem ipsum", "n/a", "not applicable", "tbd", "to be determined"
-        ]
-    }
-    
+    user_text_lower = user_text.lower()
+    # Whole words the user said: most values match one of these, which is an
+    # O(1) lookup; only misses fall back to scanning the whole transcript
+    user_tokens = frozenset(_WORD_RE.findall(user_text_lower))
+
     def clean_value(value, field_type="generic"):
         """Clean a single value and verify it appears in user text."""
         if not value:
@@ -249,11 +600,10 @@ def validate_and_clean_data(data: Dict[str, Any], user_text: str = "") -> Dict[s
             value_lower = value.lower().strip()
             
             # Check against patterns
-            patterns = FAKE_PATTERNS.get(field_type, []) + FAKE_PATTERNS["generic"]
-            for pattern in patterns:
-                if pattern in value_lower:
-                    print(f"⚠️ Detected fake pattern '{pattern}' in value '{value}' - removing")
-                    return None
+            match = _FAKE_PATTERN_RE.get(field_type, _FAKE_PATTERN_RE["generic"]).search(value_lower)
+            if match:
+                logger.debug("Detected fake pattern %r in value %r - removing", match.group(0), value)
+                return None
             
             # Check for very short or suspicious values
             if len(value_lower) < 2 and field_type not in ["name"]:
@@ -263,9 +613,12 @@ def validate_and_clean_data(data: Dict[str, Any], user_text: str = "") -> Dict[s
             if user_text and field_type in ["name", "email", "phone", "company", "school"]:
                 # Allow partial matches for names and companies
                 value_words = value_lower.split()
-                found = any(word in user_text.lower() for word in value_words if len(word) > 2)
+                found = any(
+                    word in user_tokens or word in user_text_lower
+                    for word in value_words if len(word) > 2
+                )
                 if not found and len(value) > 3:
-                    print(f"⚠️ Value '{value}' not found in user responses - removing")
+                    logger.debug("Value %r not found in user responses - removing", value)
                     return None
                 
             return value
@@ -386,48 +739,105 @@ def validate_and_clean_data(data: Dict[str, Any], user_text: str = "") -> Dict[s
     return cleaned
 
 
+# Body of the first markdown code block (```json ... ```), tolerating an unclosed fence
+_FENCE_RE = re.compile(r"```(?:json)?\s*(.*?)(?:```|\Z)", re.S)
+
+def parse_llm_json(content: str) -> Optional[Any]:
+    """Parse a Gemini reply as JSON; None if it isn't JSON at all."""
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        # response_mime_type asks for bare JSON, but if the model still
+        # wraps it in a markdown code block, parse the block's body
+        fence = _FENCE_RE.search(content)
+        if not fence:
+            return None
+        return orjson.loads(fence.group(1))
+
+async def _generate_json(full_prompt: str, cache_key: str) -> Dict[str, Any]:
+    # Generate content asynchronously
+    response = await model.generate_content_async(full_prompt)
+    content = response.text
+    
+    result = parse_llm_json(content)
+    if result is None:
+        # Don't cache unparsed output; a retry may well succeed
+        return {"raw_response": content}
+
+    _llm_cache[cache_key] = result
+    return result
+
+def _finish_inflight(cache_key: str, future: asyncio.Future):
+    _llm_inflight.pop(cache_key, None)
+    if not future.cancelled():
+        future.exception()  # mark retrieved even if every waiter went away
+
 async def call_gemini(prompt: str, system_message: str = "You are a strict data extraction tool. Extract ONLY what is explicitly stated. NEVER fabricate, invent, or assume information. convert the user statement to formal text without assuming anything") -> Dict[str, Any]:
     """Call Gemini API with given prompt and return JSON response."""
     try:
         # Combine system message and prompt as Gemini 1.5 Flash handles context well
         full_prompt = f"System: {system_message}\n\nUser: {prompt}"
+        cache_key = hashlib.sha256(full_prompt.encode("utf-8")).hexdigest()
+        cached = _llm_cache.get(cache_key)
+        if cached is not None:
+            return copy.deepcopy(cached)
         
-        # Generate content asynchronously
-        response = await model.generate_content_async(full_prompt)
-        content = response.text
-        
-        # Try to parse JSON from response
-        try:
-            return json.loads(content)
-        except json.JSONDecodeError:
-            # If response contains markdown code blocks, extract JSON
-            if "```json" in content:
-                json_str = content.split("```json")[1].split("```")[0].strip()
-                return json.loads(json_str)
-            elif "```" in content:
-                json_str = content.split("```")[1].split("```")[0].strip()
-                return json.loads(json_str)
-            return {"raw_response": content}
+        # Identical prompts already in flight (bursts of resubmits) share
+        # one Gemini call instead of each paying for their own
+        pending = _llm_inflight.get(cache_key)
+        if pending is None:
+            pending = asyncio.ensure_future(_generate_json(full_prompt, cache_key))
+            _llm_inflight[cache_key] = pending
+            pending.add_done_callback(lambda f: _finish_inflight(cache_key, f))
+        # Shielded so one caller disconnecting doesn't cancel the others
+        result = await asyncio.shield(pending)
+        return copy.deepcopy(result)
             
     except Exception as e:
-        print(f"Gemini API error: {e}")
+        logger.exception("Gemini API error")
         # Fallback or detailed error logging
         if hasattr(e, 'response'):
-             print(f"Gemini feedback: {e.response.prompt_feedback}")
+             logger.error("Gemini feedback: %s", e.response.prompt_feedback)
         raise HTTPException(status_code=500, detail=f"LLM API failed: {str(e)}")
 
+async def call_gemini_stream(prompt: str, system_message: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming variant of call_gemini. Yields {"delta": text} as Gemini
+    generates, then one {"result": parsed_json}. Shares call_gemini's cache:
+    a hit yields only the result.
+    """
+    full_prompt = f"System: {system_message}\n\nUser: {prompt}"
+    cache_key = hashlib.sha256(full_prompt.encode("utf-8")).hexdigest()
+    cached = _llm_cache.get(cache_key)
+    if cached is not None:
+        yield {"result": copy.deepcopy(cached)}
+        return
+
+    response = await model.generate_content_async(full_prompt, stream=True)
+    parts = []
+    async for chunk in response:
+        text = chunk.text
+        if text:
+            parts.append(text)
+            yield {"delta": text}
+
+    content = "".join(parts)
+    result = parse_llm_json(content)
+    if result is None:
+        yield {"result": {"raw_response": content}}
+        return
+    _llm_cache[cache_key] = result
+    yield {"result": copy.deepcopy(result)}
+
 @app.post("/start_session")
 async def start_session():
     """Create a new session for the user."""
     session_id = str(uuid.uuid4())
-    session_storage[session_id] = {
-        "responses": [],
-        "metadata": {
-            "created_at": datetime.now().isoformat(),
-            "completed": False
-        }
-    }
-    print(f"Created session: {session_id}")
+    await run_in_cpu_pool(session_store.create, session_id, {
+        "created_at": datetime.now().isoformat(),
+        "completed": False
+    })
+    logger.info("Created session: %s", session_id)
     return {"status": "success", "session_id": session_id}
 
 @app.post("/ask_llm")
@@ -443,7 +853,7 @@ async def ask_llm(payload: Dict[str, Any] = Body(...)):
     field = payload.get("field", "answer")
     question_id = payload.get("question_id", 0)
     
-    if not session_id or session_id not in session_storage:
+    if not session_id or not await run_in_cpu_pool(session_store.exists, session_id):
         raise HTTPException(status_code=400, detail="Invalid or missing session_id")
     
     if not transcript:
@@ -495,8 +905,11 @@ Return ONLY valid JSON. No explanations, no markdown, no extra text."""
         "timestamp": datetime.now().isoformat()
     }
     
-    session_storage[session_id]["responses"].append(response_data)
-    print(f"Added response to session {session_id}, total: {len(session_storage[session_id]['responses'])}")
+    total = await run_in_cpu_pool(session_store.append_response, session_id, response_data)
+    if total is None:
+        # Completed or pruned while the LLM call was in flight
+        raise HTTPException(status_code=400, detail="Invalid or missing session_id")
+    logger.info("Added response to session %s, total: %d", session_id, total)
 
     return {
         "status": "success",
@@ -504,43 +917,52 @@ Return ONLY valid JSON. No explanations, no markdown, no extra text."""
         "translation": result.get("translation", "")
     }
 
-def generate_ats_resume_pdf(profile: Dict[str, Any], output_path: str):
-    """Generate an ATS-friendly PDF resume from profile data."""
+# Resume PDF styles, built once: they are read-only during doc.build(), so
+# every request (and every pool thread) can share them
+_pdf_styles = getSampleStyleSheet()
+
+PDF_TITLE_STYLE = ParagraphStyle(
+    'CustomTitle',
+    parent=_pdf_styles['Heading1'],
+    fontSize=18,
+    textColor=colors.HexColor('#1a1a1a'),
+    spaceAfter=6,
+    alignment=TA_CENTER,
+    fontName='Helvetica-Bold'
+)
+
+PDF_HEADING_STYLE = ParagraphStyle(
+    'CustomHeading',
+    parent=_pdf_styles['Heading2'],
+    fontSize=12,
+    textColor=colors.HexColor('#2c3e50'),
+    spaceAfter=6,
+    spaceBefore=12,
+    fontName='Helvetica-Bold',
+    borderWidth=1,
+    borderColor=colors.HexColor('#2c3e50'),
+    borderPadding=3,
+    backColor=colors.HexColor('#ecf0f1')
+)
+
+PDF_NORMAL_STYLE = _pdf_styles['Normal']
+PDF_NORMAL_STYLE.fontSize = 10
+PDF_NORMAL_STYLE.leading = 14
+
+PDF_CONTACT_STYLE = ParagraphStyle('Contact', parent=PDF_NORMAL_STYLE, alignment=TA_CENTER, fontSize=9)
+
+def generate_ats_resume_pdf(profile: Dict[str, Any], output_path):
+    """Generate an ATS-friendly PDF resume from profile data.
+    `output_path` may be a filename or a writable binary file object."""
     doc = SimpleDocTemplate(output_path, pagesize=letter,
                            rightMargin=0.75*inch, leftMargin=0.75*inch,
                            topMargin=0.75*inch, bottomMargin=0.75*inch)
     
     story = []
-    styles = getSampleStyleSheet()
-    
-    # Custom styles
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=18,
-        textColor=colors.HexColor('#1a1a1a'),
-        spaceAfter=6,
-        alignment=TA_CENTER,
-        fontName='Helvetica-Bold'
-    )
-    
-    heading_style = ParagraphStyle(
-        'CustomHeading',
-        parent=styles['Heading2'],
-        fontSize=12,
-        textColor=colors.HexColor('#2c3e50'),
-        spaceAfter=6,
-        spaceBefore=12,
-        fontName='Helvetica-Bold',
-        borderWidth=1,
-        borderColor=colors.HexColor('#2c3e50'),
-        borderPadding=3,
-        backColor=colors.HexColor('#ecf0f1')
-    )
-    
-    normal_style = styles['Normal']
-    normal_style.fontSize = 10
-    normal_style.leading = 14
+    title_style = PDF_TITLE_STYLE
+    heading_style = PDF_HEADING_STYLE
+    normal_style = PDF_NORMAL_STYLE
+    contact_style = PDF_CONTACT_STYLE
     
     # Name and Contact
     name = str(profile.get('name', 'Candidate Name'))
@@ -548,17 +970,10 @@ def generate_ats_resume_pdf(profile: Dict[str, Any], output_path: str):
     story.append(Spacer(1, 0.1*inch))
     
     # Contact information
-    contact_parts = []
-    if profile.get('email'):
-        contact_parts.append(str(profile['email']))
-    if profile.get('phone'):
-        contact_parts.append(str(profile['phone']))
-    if profile.get('location'):
-        contact_parts.append(str(profile['location']))
+    contact_parts = [str(v) for v in (profile.get('email'), profile.get('phone'), profile.get('location')) if v]
     
     if contact_parts:
         contact_text = ' | '.join(contact_parts)
-        contact_style = ParagraphStyle('Contact', parent=normal_style, alignment=TA_CENTER, fontSize=9)
         story.append(Paragraph(contact_text, contact_style))
         story.append(Spacer(1, 0.15*inch))
     
@@ -566,10 +981,10 @@ def generate_ats_resume_pdf(profile: Dict[str, Any], output_path: str):
     links = profile.get('links', {})
     if links and isinstance(links, dict):
         link_parts = []
-        if links.get('linkedin'):
-            link_parts.append(f"LinkedIn: {str(links['linkedin'])}")
-        if links.get('github'):
-            link_parts.append(f"GitHub: {str(links['github'])}")
+        if linkedin := links.get('linkedin'):
+            link_parts.append(f"LinkedIn: {str(linkedin)}")
+        if github := links.get('github'):
+            link_parts.append(f"GitHub: {str(github)}")
         if link_parts:
             link_text = ' | '.join(link_parts)
             story.append(Paragraph(link_text, contact_style))
@@ -644,38 +1059,40 @@ def generate_ats_resume_pdf(profile: Dict[str, Any], output_path: str):
     
     # Build PDF
     doc.build(story)
-    print(f"PDF generated: {output_path}")
+    if isinstance(output_path, str):
+        logger.info("PDF generated: %s", output_path)
 
-@app.post("/build_profile")
-async def build_profile(payload: Dict[str, Any] = Body(...)):
-    """
-    Builds final profile from session data, generates ATS resume PDF.
-    Payload: { "session_id": "..." }
-    """
-    session_id = payload.get("session_id")
-    
-    if not session_id or session_id not in session_storage:
-        raise HTTPException(status_code=400, detail="Invalid or missing session_id")
-    
-    session_data = session_storage[session_id]
-    responses = session_data["responses"]
-    
-    if not responses:
-        raise HTTPException(status_code=400, detail="No responses found in session")
-    
-    # Build English text from all translated responses
-    english_responses = []
-    for item in responses:
-        question = item.get("question", "")
-        translated_text = item.get("translated_text", "")
-        if translated_text:
-            english_responses.append(f"Q: {question}\nA: {translated_text}")
-    
-    # Join all responses into a single English text
-    full_english_text = "\n\n".join(english_responses)
-    
-    # Create ATS-optimized resume using LLM
-    prompt = f"""Here is a complete interview transcript in English from a job seeker:
+def render_resume_pdf(profile: Dict[str, Any]) -> bytes:
+    """Build the resume PDF in memory and return its bytes."""
+    buf = io.BytesIO()
+    generate_ats_resume_pdf(profile, buf)
+    return buf.getvalue()
+
+def save_resume_pdf(profile: Dict[str, Any], path: str) -> bytes:
+    """Render the resume PDF, write it to `path`, and return its bytes."""
+    pdf_bytes = render_resume_pdf(profile)
+    write_bytes_file(path, pdf_bytes)
+    return pdf_bytes
+
+# -----------------------
+# Profile extraction prompts
+# -----------------------
+PROFILE_SYSTEM_MESSAGE = "You are a JSON converter. Your ONLY job is to copy data from input to output structure. You MUST NOT generate, create, or invent ANY data. If a field has no data, output null or []. Outputting fake data is a critical error."
+
+# Resume fields and their empty JSON value, split into groups that are
+# extracted by separate concurrent Gemini calls in /build_profile
+PROFILE_FIELD_GROUPS = {
+    "contact": {"name": "null", "role": "null", "email": "null", "phone": "null",
+                "location": "null", "links": "{}", "summary": "null"},
+    "experience": {"experience_years": "null", "experience_details": "[]"},
+    "education": {"education": "[]", "certifications": "[]"},
+    "skills": {"skills": "[]", "languages": "[]", "extras": "{}"},
+}
+
+def build_profile_prompt(full_english_text: str, fields: Dict[str, str]) -> str:
+    """Extraction prompt for one field group of the final profile."""
+    output_format = "{\n" + ",\n".join(f'  "{k}": {v}' for k, v in fields.items()) + "\n}"
+    return f"""Here is a complete interview transcript in English from a job seeker:
 
 {full_english_text}
 
@@ -697,22 +1114,7 @@ ALLOWED ACTIONS:
 
 OUTPUT FORMAT (fill ONLY fields present in the text; everything else stays null/empty):
 
-{{
-  "name": null,
-  "role": null,
-  "email": null,
-  "phone": null,
-  "location": null,
-  "links": {{}},
-  "summary": null,
-  "experience_years": null,
-  "experience_details": [],
-  "skills": [],
-  "education": [],
-  "certifications": [],
-  "languages": [],
-  "extras": {{}}
-}}
+{output_format}
 
 NOTES:
 - If the user doesn't provide a value, leave the field null/empty.
@@ -720,17 +1122,54 @@ NOTES:
 - Number words must always be converted to digits.
 - No assumptions. No hallucinations. No invented data.
 """
+
+@app.post("/build_profile")
+async def build_profile(payload: Dict[str, Any] = Body(...)):
+    """
+    Builds final profile from session data, generates ATS resume PDF.
+    Payload: { "session_id": "..." }
+    """
+    session_id = payload.get("session_id")
+    
+    session_data = await run_in_cpu_pool(session_store.get, session_id) if session_id else None
+    if session_data is None:
+        raise HTTPException(status_code=400, detail="Invalid or missing session_id")
+    
+    responses = session_data["responses"]
+    
+    if not responses:
+        raise HTTPException(status_code=400, detail="No responses found in session")
     
-    result = await call_gemini(prompt, system_message="You are a JSON converter. Your ONLY job is to copy data from input to output structure. You MUST NOT generate, create, or invent ANY data. If a field has no data, output null or []. Outputting fake data is a critical error.")
+    # Build English text from all translated responses
+    english_responses = []
+    for item in responses:
+        question = item.get("question", "")
+        translated_text = item.get("translated_text", "")
+        if translated_text:
+            english_responses.append(f"Q: {question}\nA: {translated_text}")
+    
+    # Join all responses into a single English text
+    full_english_text = "\n\n".join(english_responses)
+    
+    # Extract each field group with its own smaller prompt, concurrently, so
+    # wall time is the slowest group rather than one long generation
+    parts = await asyncio.gather(*(
+        call_gemini(build_profile_prompt(full_english_text, fields), system_message=PROFILE_SYSTEM_MESSAGE)
+        for fields in PROFILE_FIELD_GROUPS.values()
+    ))
+    result = {}
+    for fields, part in zip(PROFILE_FIELD_GROUPS.values(), parts):
+        # Each group only owns its own keys; ignore anything else it echoes back
+        result.update({k: v for k, v in part.items() if k in fields})
 
     # ⚠️ CRITICAL: Validate and clean result to remove fake patterns
-    print("🔍 Validating data for fake patterns...")
+    logger.debug("Validating data for fake patterns...")
     
     # Build a validation text from all English responses for cross-checking
     validation_text = " ".join([str(item.get("translated_text", "")).lower() for item in responses])
     
     cleaned_result = validate_and_clean_data(result, validation_text)
-    print("✅ Data validation complete")
+    logger.debug("Data validation complete")
     
     # Mark session as completed
     session_data["metadata"]["completed"] = True
@@ -739,37 +1178,50 @@ NOTES:
     
     # Save session data and generate PDF
     try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        name = cleaned_result.get("name", "unknown").replace(" ", "_").replace("/", "_")
+        # Date for humans, nanoseconds so same-second saves don't collide
+        timestamp = f"{datetime.now():%Y%m%d}_{time.time_ns()}"
+        name = filename_safe_name(cleaned_result.get("name"))
         
-        # Save complete session JSON
+        # Save complete session JSON and render + save the PDF resume, both
+        # off the event loop and concurrently. The PDF is on disk before we
+        # respond, so a download routed to another worker can find it
         json_filename = os.path.join(DATABASE_DIR, f"session_{timestamp}_{name}.json")
-        with open(json_filename, "w", encoding="utf-8") as f:
-            json.dump(session_data, f, indent=2, ensure_ascii=False)
-        print(f"Saved session data to {json_filename}")
+        pdf_name = f"resume_{timestamp}_{name}.pdf"
+        pdf_filename = os.path.join(DATABASE_DIR, pdf_name)
+        _, pdf_bytes = await asyncio.gather(
+            run_in_cpu_pool(write_json_file, json_filename, session_data),
+            run_in_cpu_pool(save_resume_pdf, cleaned_result, pdf_filename),
+        )
+        logger.info("Saved session data to %s", json_filename)
+        logger.info("Generated PDF resume: %s", pdf_filename)
         
-        # Generate PDF resume
-        pdf_filename = os.path.join(DATABASE_DIR, f"resume_{timestamp}_{name}.pdf")
-        generate_ats_resume_pdf(cleaned_result, pdf_filename)
-        print(f"Generated PDF resume: {pdf_filename}")
+        # This worker serves the download from memory
+        _pdf_cache[pdf_name] = pdf_bytes
         
-        # Clean up session from memory
-        del session_storage[session_id]
-        print(f"Cleaned up session: {session_id}")
+        # Clean up session from the store
+        await run_in_cpu_pool(session_store.delete, session_id)
+        logger.info("Cleaned up session: %s", session_id)
         
     except Exception as e:
-        print(f"Failed to save session/PDF: {e}")
+        logger.exception("Failed to save session/PDF")
         raise HTTPException(status_code=500, detail=f"Failed to generate resume: {str(e)}")
     
     return {
         "status": "success",
         "profile": cleaned_result,
-        "pdf_filename": f"resume_{timestamp}_{name}.pdf"
+        "pdf_filename": pdf_name
     }
 
 @app.get("/download_resume/{filename}")
 async def download_resume(filename: str):
     """Download generated PDF resume."""
+    # Only generated resumes; DATABASE_DIR also holds session JSON dumps
+    if os.path.basename(filename) != filename or not (filename.startswith("resume_") and filename.endswith(".pdf")):
+        raise HTTPException(status_code=404, detail="Resume not found")
+    pdf_bytes = _pdf_cache.get(filename)
+    if pdf_bytes is not None:
+        return Response(pdf_bytes, media_type='application/pdf',
+                        headers={"Content-Disposition": f'attachment; filename="{filename}"'})
     filepath = os.path.join(DATABASE_DIR, filename)
     if not os.path.exists(filepath):
         raise HTTPException(status_code=404, detail="Resume not found")
@@ -787,42 +1239,35 @@ async def search_jobs_endpoint(payload: Dict[str, Any] = Body(...)):
     if not profile:
         raise HTTPException(status_code=400, detail="Profile data is required")
     
+    fingerprint = hashlib.blake2b(orjson.dumps(profile, option=orjson.OPT_SORT_KEYS), digest_size=12).hexdigest()
+    cached = _jobs_cache.get(fingerprint)
+    if cached is not None:
+        return cached
+    
     try:
-        # Search jobs using the job_search module
-        jobs = search_jobs(profile, min_score=3)
+        # search_jobs blocks on the job-board APIs; keep it off the event loop
+        jobs = await run_in_threadpool(search_jobs, profile, min_score=3)
         
-        return {
+        result = {
             "status": "success",
             "jobs": jobs,
             "count": len(jobs)
         }
+        if jobs:
+            # An empty list may be a transient fetch failure; don't pin it
+            _jobs_cache[fingerprint] = result
+        return result
     except Exception as e:
-        print(f"Job search error: {e}")
+        logger.exception("Job search error")
         raise HTTPException(status_code=500, detail=f"Job search failed: {str(e)}")
 
-@app.post("/build_profile_legacy")
-async def build_profile(payload: Dict[str, Any] = Body(...)):
-    """
-    Accepts array of Q&A JSON responses, merges and normalizes into final profile.
-    Payload: { "qa_responses": [{ "question_id": 1, "field": "name", "extracted_data": {...} }, ...] }
-    """
-    qa_responses = payload.get("qa_responses", [])
-    if not qa_responses:
-        raise HTTPException(status_code=400, detail="Q&A responses are required")
-    
-    # Merge all Q&A responses - extract data from nested structure
-    merged_data = {}
-    for item in qa_responses:
-        # Each item has structure: { "question_id": 1, "field": "name", "extracted_data": {...} }
-        if "extracted_data" in item and isinstance(item["extracted_data"], dict):
-            merged_data.update(item["extracted_data"])
-        elif "field" in item and any(k for k in item.keys() if k not in ["question_id", "field", "question", "transcript"]):
-            # If data is at top level (legacy format)
-            field_data = {k: v for k, v in item.items() if k not in ["question_id", "field", "question", "transcript"]}
-            merged_data.update(field_data)
-    
-    prompt = f"""Here is raw resume data collected from a user interview:
-{json.dumps(merged_data, indent=2)}
+# Bookkeeping keys on a legacy Q&A item; everything else is answer data
+_QA_META_KEYS = frozenset(("question_id", "field", "question", "transcript"))
+
+LEGACY_SYSTEM_MESSAGE = "You are an expert resume builder that creates structured JSON profiles."
+
+LEGACY_PROMPT_TEMPLATE = """Here is raw resume data collected from a user interview:
+%s
 
 Please normalize and structure this into a clean professional resume JSON with these fields:
 - name (string)
@@ -840,44 +1285,173 @@ Please normalize and structure this into a clean professional resume JSON with t
 - extras (object for any additional relevant info)
 
 Return ONLY a valid JSON object with all available fields. Use null for missing fields."""
+
+# Normalized profiles keyed by a hash of the merged answers: a resubmitted,
+# unchanged qa_responses skips both the LLM and the resume write
+_legacy_profiles = LRUCache(maxsize=1024)
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+@app.post("/build_profile_legacy")
+async def build_profile(request: Request, response: Response, background_tasks: BackgroundTasks,
+                        payload: Dict[str, Any] = Body(...), stream: bool = False):
+    """
+    Accepts array of Q&A JSON responses, merges and normalizes into final profile.
+    Payload: { "qa_responses": [{ "question_id": 1, "field": "name", "extracted_data": {...} }, ...] }
+    With ?stream=true, returns NDJSON: {"delta": ...} lines as the LLM
+    generates, then a final {"status": "success", "profile": {...}} line.
+    Responses carry an ETag of the merged answers; resending it in
+    If-None-Match for unchanged answers returns 304.
+    """
+    qa_responses = payload.get("qa_responses", [])
+    if not qa_responses:
+        raise HTTPException(status_code=400, detail="Q&A responses are required")
+    
+    # Merge all Q&A responses - extract data from nested structure
+    merged_data = {}
+    for item in qa_responses:
+        # Each item has structure: { "question_id": 1, "field": "name", "extracted_data": {...} }
+        if not isinstance(item, dict):
+            continue
+        extracted = item.get("extracted_data")
+        if isinstance(extracted, dict):
+            merged_data.update(extracted)
+        elif "field" in item:
+            # If data is at top level (legacy format); an item with only
+            # metadata keys contributes nothing
+            merged_data.update({k: v for k, v in item.items() if k not in _QA_META_KEYS})
     
-    result = await call_gemini(prompt, system_message="You are an expert resume builder that creates structured JSON profiles.")
+    req_hash = hashlib.blake2b(orjson.dumps(merged_data, option=orjson.OPT_SORT_KEYS), digest_size=16).hexdigest()
+    etag = f'"{req_hash}"'
+    cached = _legacy_profiles.get(req_hash)
+    if cached is not None:
+        if _etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        body = {"status": "success", "profile": copy.deepcopy(cached)}
+        if stream:
+            line = orjson.dumps(body) + b"\n"
+            return StreamingResponse(iter([line]), media_type="application/x-ndjson", headers={"ETag": etag})
+        response.headers["ETag"] = etag
+        return body
     
-    # Save final resume to database
-    try:
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        name = result.get("name", "unknown").replace(" ", "_")
-        filename = os.path.join(DATABASE_DIR, f"resume_{timestamp}_{name}.json")
-        
-        with open(filename, "w", encoding="utf-8") as f:
-            json.dump(result, f, indent=2, ensure_ascii=False)
-            
-        print(f"Saved resume to {filename}")
-    except Exception as e:
-        print(f"Failed to save resume: {e}")
+    # Compact, canonical encoding: indentation only costs input tokens, and
+    # a stable key order lets reordered answers hit call_gemini's cache
+    prompt = LEGACY_PROMPT_TEMPLATE % json.dumps(merged_data, separators=(",", ":"), sort_keys=True, ensure_ascii=False)
+    
+    if stream:
+        return StreamingResponse(stream_legacy_profile(prompt, req_hash), media_type="application/x-ndjson",
+                                 headers={"ETag": etag})
+
+    result = await call_gemini(prompt, system_message=LEGACY_SYSTEM_MESSAGE)
+    # Persist after the response is sent; the client doesn't wait on disk
+    background_tasks.add_task(save_legacy_resume, result)
+    remember_legacy_profile(req_hash, result)
+    response.headers["ETag"] = etag
     
     return {
         "status": "success",
         "profile": result
     }
 
+def remember_legacy_profile(req_hash: str, result: Dict[str, Any]):
+    if "raw_response" not in result:
+        _legacy_profiles[req_hash] = copy.deepcopy(result)
+
+async def stream_legacy_profile(prompt: str, req_hash: str):
+    """NDJSON body for /build_profile_legacy?stream=true: {"delta": ...} lines
+    while Gemini generates, then {"status": "success", "profile": ...}."""
+    try:
+        async for event in call_gemini_stream(prompt, LEGACY_SYSTEM_MESSAGE):
+            if "delta" in event:
+                yield orjson.dumps(event) + b"\n"
+            else:
+                result = event["result"]
+                remember_legacy_profile(req_hash, result)
+                yield orjson.dumps({"status": "success", "profile": result}) + b"\n"
+                # Final line is already out; write off the event loop
+                await run_in_cpu_pool(save_legacy_resume, result)
+    except Exception as e:
+        # Headers are already sent, so report the failure in-band
+        logger.exception("Gemini API error")
+        yield orjson.dumps({"status": "error", "detail": f"LLM API failed: {str(e)}"}) + b"\n"
+
+def save_legacy_resume(result: Dict[str, Any]):
+    # Save final resume to database
+    try:
+        # Date for humans, nanoseconds so same-second saves don't collide
+        timestamp = f"{datetime.now():%Y%m%d}_{time.time_ns()}"
+        name = filename_safe_name(result.get("name"))
+        filename = os.path.join(DATABASE_DIR, f"resume_{timestamp}_{name}.json")
+        write_json_file(filename, result)
+        logger.info("Saved resume to %s", filename)
+    except Exception:
+        logger.exception("Failed to save resume")
+
+# Static GET payloads, encoded once at import
+_ROOT_RESPONSE_JSON = orjson.dumps({"message": "JobSathi API - Resume Builder", "version": "6.0.0", "docs": "/docs"})
+_HEALTH_RESPONSE_JSON = orjson.dumps({"status": "healthy", "service": "JobSathi API"})
+_LANGUAGES_RESPONSE_JSON = orjson.dumps({
+    "status": "success",
+    "languages": [{"code": k, "label": v} for k, v in LANGUAGE_NAME.items()],
+})
+# Keyed by whether the ASR model is loaded; DEVICE is fixed for the process
+_MODEL_STATUS_JSON = {
+    loaded: orjson.dumps({"asr_model_loaded": loaded, "device": DEVICE})
+    for loaded in (True, False)
+}
+
+def _json_bytes(body: bytes) -> Response:
+    return Response(body, media_type="application/json")
+
 @app.get("/")
 async def root():
-    return {"message": "JobSathi API - Resume Builder", "version": "6.0.0", "docs": "/docs"}
+    return _json_bytes(_ROOT_RESPONSE_JSON)
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy", "service": "JobSathi API"}
+    return _json_bytes(_HEALTH_RESPONSE_JSON)
 
 @app.get("/languages")
-def list_languages():
-    languages = [{"code": k, "label": v} for k, v in LANGUAGE_NAME.items()]
-    return {"status": "success", "languages": languages}
+async def list_languages():
+    return _json_bytes(_LANGUAGES_RESPONSE_JSON)
 
 @app.get("/model-status")
-def model_status():
-    asr_loaded = _asr_model is not None
-    return {"asr_model_loaded": asr_loaded, "device": DEVICE}
+async def model_status():
+    return _json_bytes(_MODEL_STATUS_JSON[_asr_model is not None])
+
+def require_admin(request: Request):
+    # 404 rather than 403 when disabled, so the route isn't advertised
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    token = request.headers.get("x-admin-token", "")
+    if not hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+@app.post("/admin/unload")
+async def unload_asr_model(request: Request):
+    """
+    Free the ASR model on explicit request only. empty_cache() walks the whole
+    caching allocator, so never call this per request; the next /transcribe
+    reloads the model. Requires ADMIN_TOKEN in the X-Admin-Token header.
+    """
+    require_admin(request)
+    def _unload():
+        global _asr_model, _asr_eager
+        if _asr_model is None:
+            return
+        logger.info("Unloading ASR model to free memory")
+        _asr_model = _asr_eager = None
+        gc.collect()
+        if DEVICE == "cuda":
+            torch.cuda.empty_cache()
+
+    # Queue behind in-flight transcriptions on the ASR worker
+    await asyncio.get_running_loop().run_in_executor(_asr_executor, _unload)
+    return {"status": "success", "asr_model_loaded": False}
 
 @app.api_route("/audio/{language}/{filename}", methods=["GET", "HEAD"])
 async def serve_audio(language: str, filename: str):
@@ -0,0 +1,100 @@
+# session_store.py
+# Interview session persistence shared across worker processes
+
+import sqlite3
+import threading
+import time
+from typing import Dict, Any, Optional
+
+import orjson
+
+
+class SessionStore:
+    """
+    SQLite-backed replacement for the in-process session dict.
+
+    Every uvicorn worker opens the same database file, so a session started
+    on one worker can be answered and completed on another. WAL mode lets
+    readers and the single writer proceed without blocking each other.
+    Responses live in their own table so /ask_llm appends one row instead of
+    rewriting the whole session. Sessions older than `max_age` seconds (ones
+    that were started but never completed) are pruned whenever a new one is
+    created.
+
+    Every method does blocking SQLite I/O; call them from a thread pool, not
+    the event loop.
+    """
+
+    def __init__(self, path: str, max_age: float = 24 * 3600):
+        self.path = path
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS sessions (
+                id TEXT PRIMARY KEY,
+                metadata BLOB NOT NULL,
+                created_at REAL NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS responses (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                session_id TEXT NOT NULL REFERENCES sessions(id) ON DELETE CASCADE,
+                data BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_session ON responses(session_id, seq);
+            CREATE INDEX IF NOT EXISTS sessions_created ON sessions(created_at);
+        """)
+        self._conn.execute("PRAGMA foreign_keys=ON")
+
+    def create(self, session_id: str, metadata: Dict[str, Any]):
+        now = time.time()
+        with self._lock:
+            # Abandoned sessions; their responses go with them (ON DELETE CASCADE)
+            self._conn.execute("DELETE FROM sessions WHERE created_at < ?", (now - self.max_age,))
+            self._conn.execute(
+                "INSERT INTO sessions (id, metadata, created_at) VALUES (?, ?, ?)",
+                (session_id, orjson.dumps(metadata), now),
+            )
+
+    def exists(self, session_id: str) -> bool:
+        with self._lock:
+            row = self._conn.execute("SELECT 1 FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        return row is not None
+
+    def append_response(self, session_id: str, response: Dict[str, Any]) -> Optional[int]:
+        """Add one response to a session; returns the session's response count,
+        or None if the session no longer exists (completed or pruned)."""
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT INTO responses (session_id, data) VALUES (?, ?)",
+                    (session_id, orjson.dumps(response)),
+                )
+            except sqlite3.IntegrityError:
+                # Foreign key: the session was deleted after the caller checked it
+                return None
+            (count,) = self._conn.execute(
+                "SELECT COUNT(*) FROM responses WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return count
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Return {"responses": [...], "metadata": {...}}, or None if unknown."""
+        with self._lock:
+            row = self._conn.execute("SELECT metadata FROM sessions WHERE id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            rows = self._conn.execute(
+                "SELECT data FROM responses WHERE session_id = ? ORDER BY seq", (session_id,)
+            ).fetchall()
+        return {
+            "responses": [orjson.loads(data) for (data,) in rows],
+            "metadata": orjson.loads(row[0]),
+        }
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE id = ?", (session_id,))
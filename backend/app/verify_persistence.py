@@ -1,4 +1,5 @@
-import requests
+import asyncio
+import httpx
 import json
 import os
 import time
@@ -6,7 +7,16 @@ import time
 BASE_URL = "http://localhost:8000"
 DATABASE_DIR = "database"
 
-def test_ask_llm():
+def find_new_file(prefix, since):
+    """Return the name of a file in DATABASE_DIR starting with `prefix` and
+    modified at or after `since`, or None. Stops at the first match."""
+    with os.scandir(DATABASE_DIR) as entries:
+        for entry in entries:
+            if entry.name.startswith(prefix) and entry.stat(follow_symlinks=False).st_mtime >= since:
+                return entry.name
+    return None
+
+async def test_ask_llm(client: httpx.AsyncClient):
     print("Testing /ask_llm...")
     payload = {
         "transcript": "Mera naam Rahul hai aur main software engineer hoon.",
@@ -15,24 +25,23 @@ def test_ask_llm():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/ask_llm", json=payload)
+        t0 = time.time()
+        response = await client.post("/ask_llm", json=payload)
         response.raise_for_status()
         data = response.json()
         print("Response:", json.dumps(data, indent=2))
         
-        # Check if file created
-        files = os.listdir(DATABASE_DIR)
-        # Simple check if any new file looks like a response
-        response_files = [f for f in files if f.startswith("response_")]
-        if response_files:
-             print(f"SUCCESS: Found response files: {response_files[-1]}")
+        # Check if a response file was written by this call
+        response_file = find_new_file("response_", t0)
+        if response_file:
+             print(f"SUCCESS: Found response files: {response_file}")
         else:
              print("FAILURE: No response file found in database/")
              
     except Exception as e:
         print(f"Error testing /ask_llm: {e}")
 
-def test_build_profile():
+async def test_build_profile(client: httpx.AsyncClient):
     print("\nTesting /build_profile...")
     payload = {
         "qa_responses": [
@@ -50,28 +59,31 @@ def test_build_profile():
     }
     
     try:
-        response = requests.post(f"{BASE_URL}/build_profile", json=payload)
+        t0 = time.time()
+        response = await client.post("/build_profile", json=payload)
         response.raise_for_status()
         data = response.json()
         print("Response:", json.dumps(data, indent=2))
         
-        # Check if file created
-        files = os.listdir(DATABASE_DIR)
-        resume_files = [f for f in files if f.startswith("resume_")]
-        if resume_files:
-             print(f"SUCCESS: Found resume files: {resume_files[-1]}")
+        # Check if a resume file was written by this call
+        resume_file = find_new_file("resume_", t0)
+        if resume_file:
+             print(f"SUCCESS: Found resume files: {resume_file}")
         else:
              print("FAILURE: No resume file found in database/")
 
     except Exception as e:
         print(f"Error testing /build_profile: {e}")
 
+async def main():
+    # Both calls wait on an LLM round trip, so run them concurrently
+    async with httpx.AsyncClient(base_url=BASE_URL, timeout=60) as client:
+        await asyncio.gather(test_ask_llm(client), test_build_profile(client))
+
 if __name__ == "__main__":
     # Ensure we are in the right dir to check files, or use absolute path
     # Assuming script is run from backend/app
     if not os.path.exists(DATABASE_DIR):
         print(f"Warning: {DATABASE_DIR} does not exist yet.")
     
-    test_ask_llm()
-    time.sleep(2)
-    test_build_profile()
+    asyncio.run(main())